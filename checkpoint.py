@@ -0,0 +1,255 @@
+"""
+Points de reprise pour les longs calculs par lots
+
+Le travail est découpé en paquets déterministes de membres. Chaque paquet est identifié
+par la plage d'ID qu'il couvre (ID // taille du paquet) et par l'empreinte de ses
+données d'entrée et du calcul ; son résultat est enregistré de façon atomique. À la
+relance, les paquets déjà calculés avec les mêmes données et le même calcul sont relus
+au lieu d'être recalculés.
+"""
+import dataclasses
+import hashlib
+import math
+import os
+import pickle
+import re
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# À incrémenter si le format des fichiers de reprise change
+FORMAT_VERSION = 1
+
+# Répertoire par défaut des points de reprise
+DEFAULT_DIRECTORY = '.elmamy_checkpoints'
+
+# Seuls les fichiers portant ces noms sont gérés (et supprimés) par ce module
+_RESULT_NAME = re.compile(r'^[0-9hx-]+_[0-9a-f]{16}_[0-9a-f]{16}\.pkl$')
+_TMP_PREFIX = 'ckpt-'
+_TMP_NAME = re.compile(r'^ckpt-[^/]*\.tmp$')
+
+
+def fingerprint(*objects):
+    """
+    Empreinte SHA-256 stable d'objets Python, NumPy, pandas ou dataclasses
+
+    Pour une fonction, le bytecode et les constantes sont pris en compte, de sorte
+    qu'une modification du calcul change l'empreinte.
+
+    Returns:
+        str: empreinte hexadécimale
+    """
+    h = hashlib.sha256()
+
+    def feed_code(code):
+        h.update(code.co_code)
+        h.update(repr(code.co_names).encode())
+        for const in code.co_consts:
+            if hasattr(const, 'co_code'):
+                feed_code(const)
+            else:
+                h.update(f"{const!r};".encode())
+
+    def feed(obj):
+        if isinstance(obj, np.ndarray):
+            h.update(f"nd{obj.dtype.str}{obj.shape}".encode())
+            if obj.dtype == object:
+                h.update(repr(obj.tolist()).encode())
+            else:
+                h.update(np.ascontiguousarray(obj).tobytes())
+        elif isinstance(obj, (pd.DataFrame, pd.Series)):
+            h.update(b"pd")
+            feed(list(map(str, getattr(obj, 'columns', [obj.name]))))
+            feed(pd.util.hash_pandas_object(obj, index=True).to_numpy())
+        elif isinstance(obj, dict):
+            h.update(b"{")
+            for key in sorted(obj, key=repr):
+                feed(key)
+                feed(obj[key])
+            h.update(b"}")
+        elif isinstance(obj, (list, tuple)):
+            h.update(b"[")
+            for item in obj:
+                feed(item)
+            h.update(b"]")
+        elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            h.update(type(obj).__name__.encode())
+            feed(dataclasses.asdict(obj))
+        elif callable(obj):
+            h.update(f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}".encode())
+            code = getattr(obj, '__code__', None)
+            if code is not None:
+                feed_code(code)
+        elif hasattr(obj, '__dict__'):
+            h.update(type(obj).__name__.encode())
+            feed(vars(obj))
+        else:
+            h.update(f"{type(obj).__name__}:{obj!r};".encode())
+
+    for obj in objects:
+        feed(obj)
+    return h.hexdigest()
+
+
+class Checkpoint:
+    """
+    Répertoire de points de reprise
+
+    Les résultats sont rangés par (paquet, contexte) : des calculs différents (par exemple
+    deux grilles de balayage) partagent le répertoire sans s'effacer mutuellement. Seuls
+    les fichiers nommés par ce module sont supprimés ; les autres fichiers du répertoire
+    ne sont jamais touchés.
+
+    Args:
+        directory: répertoire de stockage (créé si nécessaire)
+        max_age: durée de conservation des fichiers non utilisés [s]
+    """
+
+    def __init__(self, directory, max_age=30 * 24 * 3600):
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+        # Index des résultats présents {préfixe (paquet, contexte): noms}, construit
+        # en une seule lecture du répertoire
+        self._index = {}
+        for name in os.listdir(directory):
+            if _RESULT_NAME.match(name):
+                self._index.setdefault(name.rsplit('_', 1)[0] + '_', set()).add(name)
+
+    def _prefix(self, label, context):
+        return f"{label}_{context[:16]}_"
+
+    def _path(self, label, context, key):
+        return os.path.join(self.directory, f"{self._prefix(label, context)}{key[:16]}.pkl")
+
+    def load(self, label, context, key):
+        """
+        Relit le résultat d'un paquet, ou None s'il est absent ou illisible
+
+        Toute erreur de relecture (fichier tronqué, autre version de numpy/pandas...)
+        est traitée comme un paquet à recalculer.
+        """
+        path = self._path(label, context, key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, result = pickle.load(f)
+            os.utime(path)
+        except Exception:
+            return None
+        return result if stored_key == key else None
+
+    def save(self, label, context, key, result):
+        """
+        Enregistre le résultat d'un paquet de façon atomique (fichier temporaire + renommage)
+
+        Les anciens résultats du même paquet et du même contexte, calculés avec
+        d'autres données, sont supprimés.
+        """
+        path = self._path(label, context, key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=_TMP_PREFIX, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((key, result), f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        name = os.path.basename(path)
+        names = self._index.setdefault(self._prefix(label, context), set())
+        for old in names - {name}:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except OSError:
+                pass
+        names.clear()
+        names.add(name)
+
+    def prune(self):
+        """
+        Supprime les fichiers de reprise (et temporaires) non utilisés depuis plus
+        de max_age secondes
+        """
+        limit = time.time() - self.max_age
+        for name in os.listdir(self.directory):
+            if not (_RESULT_NAME.match(name) or _TMP_NAME.match(name)):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except OSError:
+                continue
+
+
+def chunk_ranges(ids, chunk_size=500):
+    """
+    Répartit les membres en paquets selon la valeur de leur ID
+
+    Un ID entier va dans le paquet ID // chunk_size. Les autres ID sont répartis
+    selon leur empreinte dans une puissance de deux de paquets, choisie pour avoir
+    environ chunk_size membres par paquet : le découpage ne change que lorsque
+    le nombre de ces membres franchit une puissance de deux. Ajouter ou retirer un
+    membre n'affecte sinon que son paquet.
+
+    Returns:
+        list: liste de tuples (étiquette, positions des membres dans ids)
+    """
+    is_int = [isinstance(i, (int, np.integer)) and not isinstance(i, bool) for i in ids]
+    n_other = len(ids) - sum(is_int)
+    n_buckets = 2 ** max(0, math.ceil(math.log2(max(1, n_other / chunk_size))))
+
+    buckets = {}
+    for position, (member_id, integer) in enumerate(zip(ids, is_int)):
+        if integer:
+            start = int(member_id) // chunk_size * chunk_size
+            label = f"{start}-{start + chunk_size - 1}"
+        else:
+            digest = hashlib.sha1(repr(member_id).encode()).hexdigest()
+            label = f"h{int(digest[:8], 16) % n_buckets}x{n_buckets}"
+        buckets.setdefault(label, []).append(position)
+    return [(label, np.array(positions)) for label, positions in sorted(buckets.items())]
+
+
+def run_chunks(ids, compute, inputs, directory=DEFAULT_DIRECTORY, chunk_size=500, context=None):
+    """
+    Exécute compute paquet par paquet en réutilisant les paquets déjà calculés
+
+    Args:
+        ids: liste des ID des membres
+        compute: fonction appelée avec les positions des membres d'un paquet
+        inputs: fonction renvoyant les données d'entrée d'un paquet (pour l'empreinte)
+        directory: répertoire des points de reprise
+        chunk_size: étendue d'ID couverte par un paquet
+        context: données et fonctions communes à tous les paquets (version du calcul,
+            paramètres...), incluses dans l'empreinte
+
+    Returns:
+        list: liste de tuples (positions des membres, résultat du paquet)
+    """
+    checkpoint = Checkpoint(directory)
+    checkpoint.prune()
+    common = fingerprint(FORMAT_VERSION, compute, context)
+    results = []
+    reused = 0
+
+    for label, positions in chunk_ranges(ids, chunk_size):
+        key = fingerprint(common, [ids[i] for i in positions], inputs(positions))
+        result = checkpoint.load(label, common, key)
+        if result is None:
+            result = compute(positions)
+            checkpoint.save(label, common, key, result)
+        else:
+            reused += 1
+        results.append((positions, result))
+
+    if reused:
+        print(f"  {reused}/{len(results)} paquets repris depuis {directory}")
+    return results
@@ -0,0 +1,108 @@
+"""
+Client léger du service local Elmamy (voir service.py)
+
+N'importe que la bibliothèque standard pour que chaque appel réponde en quelques
+millisecondes lorsque le service tourne déjà.
+
+Utilisation :
+    python client.py ping
+    python client.py read Input.xlsx
+    python client.py validate Input.xlsx
+    python client.py check Input.xlsx --forces efforts.json
+    python client.py create Input.xlsx --model modele.json
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser('~'), '.elmamy.sock')
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_TOKEN_FILE = os.path.join(os.path.expanduser('~'), '.elmamy.token')
+
+
+def request(command, socket_path=DEFAULT_SOCKET, host=DEFAULT_HOST, port=None,
+            token_file=DEFAULT_TOKEN_FILE, **params):
+    """
+    Envoie une requête au service et renvoie le résultat
+
+    La connexion se fait sur la socket Unix socket_path, ou sur host:port si port est fourni ;
+    en TCP, le jeton est lu dans token_file.
+
+    Raises:
+        RuntimeError: si le service renvoie une erreur
+    """
+    message = {'command': command, 'params': params}
+    if port is not None:
+        with open(token_file, encoding='utf-8') as f:
+            message['token'] = f.read().strip()
+        sock = socket.create_connection((host, port))
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+
+    with sock, sock.makefile('rwb') as stream:
+        stream.write(json.dumps(message).encode() + b'\n')
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise ConnectionError("Connexion fermée par le service")
+    response = json.loads(line)
+
+    if not response['ok']:
+        raise RuntimeError(response['error'])
+    return response['result']
+
+
+def format_table(columns, rows):
+    """
+    Met en forme un tableau en colonnes alignées
+    """
+    cells = [[str(c) for c in columns]] + [['' if v is None else str(v) for v in row] for row in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(columns))]
+    lines = ['  '.join(v.rjust(w) for v, w in zip(r, widths)) for r in cells]
+    return '\n'.join(lines)
+
+
+# ========== LIGNE DE COMMANDE ==========
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Client du service local Elmamy")
+    parser.add_argument('command', choices=['ping', 'read', 'validate', 'check', 'create'])
+    parser.add_argument('path', nargs='?', default='Input.xlsx')
+    parser.add_argument('--socket', dest='socket_path', default=DEFAULT_SOCKET)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--forces', help="fichier JSON des efforts {id membre: [[N, My, Mz], ...]}")
+    parser.add_argument('--model', help="fichier JSON {materials, members, sections, combinations}")
+    args = parser.parse_args()
+
+    address = {'socket_path': args.socket_path, 'host': args.host, 'port': args.port}
+    path = os.path.abspath(args.path)
+
+    try:
+        if args.command == 'ping':
+            print(request('ping', **address))
+        elif args.command == 'read':
+            for name, table in request('read', path=path, **address).items():
+                print(f"\n--- {name.upper()} ---")
+                print(format_table(table['columns'], table['data']))
+        elif args.command == 'validate':
+            issues = request('validate', path=path, **address)
+            print("\n".join(issues) if issues else "Aucune anomalie détectée")
+        elif args.command == 'check':
+            with open(args.forces, encoding='utf-8') as f:
+                forces = json.load(f)
+            result = request('check', path=path, forces=forces, **address)
+            columns = list(result[0].keys()) if result else []
+            print(format_table(columns, [list(r.values()) for r in result]))
+        else:
+            with open(args.model, encoding='utf-8') as f:
+                model = json.load(f)
+            print(f"Fichier créé : {request('create', path=path, **model, **address)}")
+    except (OSError, RuntimeError) as e:
+        print(f"Erreur : {e}")
+        sys.exit(1)
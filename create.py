@@ -87,16 +87,21 @@ def load_sections_from_bdd(bdd_file='BDD_Sections.xlsx'):
     return sections_dict
 
 
-def create_input(materials, member, sections, combinations=None):
+def create_input(materials, member, sections, combinations=None, coefficients=None,
+                 filename='Input.xlsx'):
     """
-    Cette fonction lit les dictionnaires materials, member, sections et combinations 
+    Cette fonction lit les dictionnaires materials, member, sections et combinations
     et va ensuite les mettre en forme pour les intégrer à un fichier excel .xlsx au format souhaité
-    
+
     Args:
         materials: dictionnaire d'objets Material
         member: dictionnaire d'objets Element
         sections: dictionnaire d'objets Section
         combinations: dictionnaire optionnel des combinaisons analysées
+        coefficients: DataFrame optionnel des coefficients ky, kz, Cmy, Cmz indexé par
+            l'ID des membres (par exemple le résultat de sweep_coefficients). Si la colonne
+            'Admissible' est présente, seuls les jeux admissibles sont écrits.
+        filename: nom du fichier Excel à créer
     """
     
     # ========== Préparation du tableau des matériaux ==========
@@ -143,7 +148,21 @@ def create_input(materials, member, sections, combinations=None):
     df_member["kz"] = 2
     df_member["Cmy"] = 0.85
     df_member["Cmz"] = 0.85
-   
+
+    # Remplacer les valeurs par défaut par les coefficients fournis (ex. balayage)
+    if coefficients is not None:
+        # Les jeux non admissibles du balayage ne sont pas retenus : valeurs par défaut
+        if "Admissible" in coefficients.columns:
+            rejected = coefficients.index[~coefficients["Admissible"].astype(bool)]
+            if len(rejected):
+                print(f"  Aucun jeu de coefficients admissible pour les membres {list(rejected)} : "
+                      f"valeurs par défaut conservées")
+            coefficients = coefficients[coefficients["Admissible"].astype(bool)]
+        for coef in ["ky", "kz", "Cmy", "Cmz"]:
+            if coef in coefficients.columns:
+                values = coefficients[coef].reindex(df_member["ID"]).to_numpy()
+                df_member[coef] = np.where(pd.isna(values), df_member[coef], values)
+
     # Extraire les nœuds de début et fin
     df_member["Nœud début"] = df_member["nodes_id"].apply(
         lambda x: x[0] if isinstance(x, list) and len(x) > 0 else None
@@ -214,7 +233,7 @@ def create_input(materials, member, sections, combinations=None):
     
     # ========== Création du fichier Excel ==========
     
-    nom_fichier = "Input.xlsx"
+    nom_fichier = filename
     
     # Créer un fichier Excel vide
     with pd.ExcelWriter(nom_fichier, engine="openpyxl") as writer:
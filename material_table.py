@@ -0,0 +1,189 @@
+"""
+Tables des propriétés matériaux (E, Sy, Su) en fonction de la température, par nuance
+
+Les propriétés sont interpolées linéairement en une seule opération NumPy pour un
+tableau de températures. Les couples (nuance, température) déjà résolus sont conservés
+dans un cache trié par nuance, consulté lui aussi de façon vectorisée.
+"""
+import numpy as np
+from material import Material
+
+
+class MaterialTable:
+    """
+    Table de propriétés d'une nuance d'acier en fonction de la température
+
+    Args:
+        name: nom de la nuance (ex. 'S355')
+        temperatures: températures [°C]
+        E, Sy, Su: propriétés [MPa] aux températures correspondantes
+        poisson: coefficient de Poisson (supposé indépendant de la température)
+        cache_size: nombre maximal de températures résolues conservées en cache
+    """
+
+    PROPERTIES = ('E', 'Sy', 'Su')
+
+    def __init__(self, name, temperatures, E, Sy, Su, poisson=0.3, cache_size=100_000):
+        temperatures = np.asarray(temperatures, dtype=float)
+        order = np.argsort(temperatures)
+        self.name = name
+        self.temperatures = temperatures[order]
+        self.values = np.vstack([
+            np.asarray(E, dtype=float)[order],
+            np.asarray(Sy, dtype=float)[order],
+            np.asarray(Su, dtype=float)[order]
+        ])
+        self.poisson = poisson
+        self.cache_size = cache_size
+        self._cache_t = np.empty(0)
+        self._cache_v = np.empty((3, 0))
+
+        if len(np.unique(self.temperatures)) != len(self.temperatures):
+            raise ValueError(f"Températures en double dans la table {name}")
+
+    def interpolate(self, temperatures):
+        """
+        Interpole E, Sy et Su pour un tableau de températures
+
+        Returns:
+            tuple: (E, Sy, Su), tableaux de même forme que temperatures
+
+        Raises:
+            ValueError: si une température est NaN ou hors de la plage de la table
+                (pas d'extrapolation, qui serait non conservative à chaud)
+        """
+        temperatures = np.asarray(temperatures, dtype=float)
+        if np.isnan(temperatures).any():
+            raise ValueError(f"Température NaN pour la nuance {self.name}")
+        t_min, t_max = self.temperatures[0], self.temperatures[-1]
+        outside = (temperatures < t_min) | (temperatures > t_max)
+        if outside.any():
+            raise ValueError(
+                f"Températures hors de la table {self.name} [{t_min:g} ; {t_max:g}] °C : "
+                f"{np.unique(temperatures[outside])[:10].tolist()}"
+            )
+
+        unique, inverse = np.unique(temperatures.ravel(), return_inverse=True)
+
+        # Recherche des températures déjà résolues dans le cache trié
+        n_cached = len(self._cache_t)
+        pos = np.minimum(np.searchsorted(self._cache_t, unique), max(n_cached - 1, 0))
+        hit = self._cache_t[pos] == unique if n_cached else np.zeros(len(unique), dtype=bool)
+
+        values = np.empty((3, len(unique)))
+        values[:, hit] = self._cache_v[:, pos[hit]]
+        miss = ~hit
+        if miss.any():
+            new_t = unique[miss]
+            new_v = np.stack([np.interp(new_t, self.temperatures, v) for v in self.values])
+            values[:, miss] = new_v
+            if n_cached + len(new_t) <= self.cache_size:
+                cache_t = np.concatenate([self._cache_t, new_t])
+                order = np.argsort(cache_t, kind='stable')
+                self._cache_t = cache_t[order]
+                self._cache_v = np.concatenate([self._cache_v, new_v], axis=1)[:, order]
+
+        out = values[:, inverse].reshape((3,) + temperatures.shape)
+        return out[0], out[1], out[2]
+
+    def material(self, temperature):
+        """
+        Renvoie l'objet Material de la nuance à la température donnée
+        """
+        E, Sy, Su = self.interpolate(temperature)
+        return Material(
+            name=self.name,
+            temperature=temperature,
+            E=np.float64(E),
+            Sy=np.float64(Sy),
+            Su=np.float64(Su),
+            poisson=np.float64(self.poisson)
+        )
+
+
+def tables_from_materials(materials, keys=None):
+    """
+    Regroupe un dictionnaire d'objets Material en tables
+
+    Par défaut, une table est construite par nuance. Des matériaux de même nuance
+    définis à la même température avec des valeurs différentes (ex. deux S355 à 50 °C)
+    doivent être séparés en tables distinctes à l'aide de keys.
+
+    Args:
+        materials: dictionnaire d'objets Material
+        keys: dictionnaire optionnel {ID matériau: clé de table}. Les matériaux absents
+            sont rangés dans la table de leur nuance.
+
+    Returns:
+        dict: Dictionnaire {clé de table: MaterialTable}
+
+    Raises:
+        ValueError: si une table contient deux points incompatibles à la même température
+    """
+    keys = keys or {}
+    groups = {}
+    for mat_id, mat in materials.items():
+        key = keys.get(mat_id, mat.name)
+        group = groups.setdefault(key, {'name': mat.name, 'poisson': mat.poisson, 'points': {}})
+        values = (float(mat.E), float(mat.Sy), float(mat.Su))
+        temperature = float(mat.temperature)
+        if temperature in group['points'] and group['points'][temperature][1] != values:
+            other = group['points'][temperature][0]
+            raise ValueError(
+                f"Matériaux {other} et {mat_id} ({mat.name}) différents à {temperature:g} °C "
+                f"dans la table '{key}' : les séparer avec keys"
+            )
+        group['points'][temperature] = (mat_id, values)
+
+    tables = {}
+    for key, group in groups.items():
+        temperatures = list(group['points'].keys())
+        E, Sy, Su = zip(*(values for _, values in group['points'].values()))
+        tables[key] = MaterialTable(group['name'], temperatures, E, Sy, Su,
+                                    poisson=group['poisson'])
+    return tables
+
+
+def resolve_properties(tables, grades, temperatures):
+    """
+    Résout E, Sy et Su pour des tableaux de nuances et de températures de membres
+
+    Un seul appel d'interpolation est fait par table présente.
+
+    Args:
+        tables: dictionnaire {clé de table: MaterialTable}
+        grades: séquence des clés de table des membres
+        temperatures: séquence des températures des membres [°C]
+
+    Returns:
+        tuple: (E, Sy, Su), tableaux alignés sur les membres
+    """
+    grades = np.asarray(grades)
+    temperatures = np.asarray(temperatures, dtype=float)
+    out = np.empty((3,) + temperatures.shape)
+    for name in np.unique(grades):
+        if name not in tables:
+            raise KeyError(f"Table matériau '{name}' absente")
+        mask = grades == name
+        out[:, mask] = np.stack(tables[name].interpolate(temperatures[mask]))
+    return out[0], out[1], out[2]
+
+
+# ========== TEST ==========
+
+if __name__ == "__main__":
+
+    tables = {
+        'S355': MaterialTable(
+            'S355',
+            temperatures=[20, 50, 100, 150, 200],
+            E=[204000, 202000, 200000, 197000, 193000],
+            Sy=[355, 334, 312, 294, 278],
+            Su=[470, 470, 470, 470, 470]
+        )
+    }
+
+    temperatures = np.random.default_rng(0).uniform(20, 200, 10000).round(1)
+    E, Sy, Su = resolve_properties(tables, ['S355'] * len(temperatures), temperatures)
+    print(f"{len(temperatures)} membres résolus")
+    print(tables['S355'].material(75))
@@ -0,0 +1,309 @@
+"""
+Service local résident gardant en mémoire le catalogue des sections et les derniers
+fichiers INPUT lus, pour répondre rapidement aux demandes répétées
+
+Le service écoute par défaut sur une socket Unix accessible au seul utilisateur (0600),
+ou sur localhost (TCP) si un port est fourni. En TCP, chaque requête doit porter le jeton
+écrit au démarrage dans ~/.elmamy.token (droits 0600). Dans tous les cas, seuls les
+fichiers situés sous le répertoire de travail configuré (--root) peuvent être lus, et
+create n'écrit que des fichiers .xlsx. Le protocole est une ligne JSON par requête :
+{"command": ..., "params": {...}, "token": ...}, et une ligne JSON par réponse :
+{"ok": true, "result": ...} ou {"ok": false, "error": ...}. Toute ligne invalide
+ferme la connexion.
+
+Utilisation :
+    python service.py [--socket ~/.elmamy.sock | --port 8765] [--root .] [--bdd BDD_Sections.xlsx]
+
+Les requêtes sont envoyées avec client.py.
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import secrets
+from collections import OrderedDict
+
+from client import DEFAULT_SOCKET, DEFAULT_HOST, DEFAULT_TOKEN_FILE
+
+
+# Taille maximale d'une requête (efforts de milliers de membres)
+LINE_LIMIT = 64 * 1024 * 1024
+
+COMMANDS = ('ping', 'read', 'validate', 'check', 'create')
+
+
+class ModelCache:
+    """
+    Cache LRU des fichiers lus, invalidé lorsque la date de modification du fichier change
+
+    Args:
+        loader: fonction de lecture appelée avec le chemin du fichier
+        maxsize: nombre maximal de fichiers conservés
+    """
+
+    def __init__(self, loader, maxsize=16):
+        self.loader = loader
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == mtime:
+            self._entries.move_to_end(path)
+            return entry[1]
+
+        value = self.loader(path)
+        self._entries[path] = (mtime, value)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, path):
+        self._entries.pop(os.path.abspath(path), None)
+
+
+def _int_keys(d):
+    """
+    Les clés JSON sont des chaînes : on rétablit les identifiants entiers
+    """
+    return {int(k) if str(k).lstrip('-').isdigit() else k: v for k, v in d.items()}
+
+
+def _frames_to_json(data):
+    return {
+        name: json.loads(df.to_json(orient='split', index=False, force_ascii=False))
+        for name, df in data.items()
+    }
+
+
+class ElmamyService:
+    """
+    Traite les requêtes create, read, validate et check en s'appuyant sur les caches
+
+    Les modules de calcul (pandas, openpyxl...) ne sont importés qu'au démarrage du service.
+
+    Args:
+        bdd_file: fichier du catalogue des sections
+        root: répertoire de travail ; les chemins demandés doivent s'y trouver
+        maxsize: nombre de fichiers INPUT conservés en mémoire
+        token: jeton exigé dans chaque requête (None = pas de jeton)
+    """
+
+    def __init__(self, bdd_file='BDD_Sections.xlsx', root='.', maxsize=16, token=None):
+        from create import load_sections_from_bdd
+        from read_input import read_input
+
+        self.bdd_file = bdd_file
+        self.root = os.path.realpath(root)
+        self.token = token
+        self.catalogue = ModelCache(load_sections_from_bdd, maxsize=1)
+        self.models = ModelCache(read_input, maxsize=maxsize)
+        self._lock = asyncio.Lock()
+
+    def sections(self):
+        return self.catalogue.get(self.bdd_file)
+
+    def _path(self, path):
+        """
+        Résout un chemin demandé et vérifie qu'il se trouve sous le répertoire de travail
+
+        Raises:
+            PermissionError: si le chemin sort du répertoire de travail
+        """
+        resolved = os.path.realpath(os.path.join(self.root, path))
+        if os.path.commonpath([self.root, resolved]) != self.root:
+            raise PermissionError(f"Chemin hors du répertoire de travail {self.root} : {path}")
+        return resolved
+
+    # ========== Commandes ==========
+
+    def ping(self):
+        return 'pong'
+
+    def read(self, path):
+        return _frames_to_json(self.models.get(self._path(path)))
+
+    def validate(self, path):
+        """
+        Contrôle la cohérence du fichier INPUT et renvoie la liste des anomalies
+        """
+        import pandas as pd
+
+        data = self.models.get(self._path(path))
+        issues = []
+        for name in ['Matériaux', 'Membres', 'Sections']:
+            if name not in data or data[name].empty:
+                issues.append(f"Tableau '{name}' absent ou vide")
+        if issues:
+            return issues
+
+        df_mem = data['Membres'].rename(columns=lambda c: str(c).strip())
+        df_sec = data['Sections'].rename(columns=lambda c: str(c).strip())
+        df_mat = data['Matériaux'].rename(columns=lambda c: str(c).strip())
+        known_sec = set(df_sec['ID']) | set(df_sec['Nom'])
+        known_mat = set(df_mat['ID']) | set(df_mat['Nom'])
+
+        for _, row in df_mem.iterrows():
+            member = row['ID']
+            if row['Section'] not in known_sec:
+                issues.append(f"Membre {member} : section '{row['Section']}' inconnue")
+            if row['Matériau'] not in known_mat:
+                issues.append(f"Membre {member} : matériau '{row['Matériau']}' inconnu")
+            for col in ['Longueur λ [mm]', 'Longueur Lc [mm]', 'ky', 'kz', 'Cmy', 'Cmz']:
+                value = row.get(col)
+                if value is None or pd.isna(value) or float(value) <= 0:
+                    issues.append(f"Membre {member} : valeur '{col}' invalide ({value})")
+        if df_mem['ID'].duplicated().any():
+            issues.append("Identifiants de membres en double")
+        return issues
+
+    def check(self, path, forces):
+        """
+        Vérifie les membres du fichier INPUT avec les efforts {id membre: [[N, My, Mz], ...]}
+        """
+        from sweep import prepare_from_input, check_members
+
+        prepared = prepare_from_input(self.models.get(self._path(path)))
+        # Vérification interactive courte : pas de points de reprise
+        result = check_members(prepared, _int_keys(forces), checkpoint_dir=None)
+        result = result.reset_index()
+        return json.loads(result.to_json(orient='records', force_ascii=False))
+
+    def create(self, path, materials, members, sections, combinations=None):
+        """
+        Crée un fichier INPUT ; les sections sont désignées par leur nom dans le catalogue
+        """
+        from create import create_input
+        from material import Material
+        from element import Element
+
+        if not path.lower().endswith('.xlsx'):
+            raise PermissionError(f"create n'écrit que des fichiers .xlsx : {path}")
+        path = self._path(path)
+        catalogue = {sec.name: sec for sec in self.sections().values()}
+        missing = [name for name in sections if name not in catalogue]
+        if missing:
+            raise KeyError(f"Sections absentes du catalogue : {', '.join(missing)}")
+
+        create_input(
+            materials={k: Material(**v) for k, v in _int_keys(materials).items()},
+            member={k: Element(**v) for k, v in _int_keys(members).items()},
+            sections={i: catalogue[name] for i, name in enumerate(sections, start=1)},
+            combinations=combinations,
+            filename=path
+        )
+        self.models.invalidate(path)
+        return path
+
+    # ========== Serveur ==========
+
+    def _parse(self, line):
+        """
+        Décode une ligne de requête
+
+        Raises:
+            ValueError: si la requête est invalide ou si le jeton ne correspond pas
+        """
+        request = json.loads(line)
+        if not isinstance(request, dict) or request.get('command') not in COMMANDS:
+            raise ValueError("Requête invalide")
+        if not isinstance(request.get('params', {}), dict):
+            raise ValueError("Paramètres invalides")
+        if self.token is not None and not hmac.compare_digest(
+                str(request.get('token', '')).encode(), self.token.encode()):
+            raise ValueError("Jeton invalide")
+        return request
+
+    async def handle(self, reader, writer):
+        async def respond(response):
+            writer.write(json.dumps(response, default=str, ensure_ascii=False).encode() + b'\n')
+            await writer.drain()
+
+        try:
+            while True:
+                # Une requête trop longue, illisible ou non authentifiée ferme la connexion
+                try:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    request = self._parse(line)
+                except (ValueError, asyncio.LimitOverrunError, asyncio.IncompleteReadError) as e:
+                    await respond({'ok': False, 'error': f"{type(e).__name__}: {e}"})
+                    break
+
+                try:
+                    method = getattr(self, request['command'])
+                    # Les lectures Excel sont bloquantes : exécution dans un thread,
+                    # une requête à la fois pour protéger les caches
+                    async with self._lock:
+                        result = await asyncio.to_thread(method, **request.get('params', {}))
+                    response = {'ok': True, 'result': result}
+                except Exception as e:
+                    response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                await respond(response)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def write_token(path=DEFAULT_TOKEN_FILE):
+    """
+    Génère un jeton aléatoire et l'écrit dans path, lisible par le seul utilisateur
+    """
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        os.fchmod(f.fileno(), 0o600)
+        f.write(token)
+    return token
+
+
+async def serve(service, socket_path=DEFAULT_SOCKET, host=DEFAULT_HOST, port=None):
+    """
+    Lance le service sur la socket Unix socket_path (droits 0600), ou sur host:port
+    si port est fourni ; en TCP, un jeton est exigé
+    """
+    if port is not None:
+        if service.token is None:
+            service.token = write_token()
+            print(f"Jeton écrit dans {DEFAULT_TOKEN_FILE}")
+        server = await asyncio.start_server(service.handle, host=host, port=port,
+                                            limit=LINE_LIMIT)
+        print(f"Service à l'écoute sur {host}:{port}")
+    else:
+        # La socket est créée directement avec les droits 0600
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(service.handle, path=socket_path,
+                                                     limit=LINE_LIMIT)
+        finally:
+            os.umask(umask)
+        print(f"Service à l'écoute sur {socket_path}")
+    async with server:
+        await server.serve_forever()
+
+
+# ========== LANCEMENT ==========
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Service local Elmamy")
+    parser.add_argument('--socket', dest='socket_path', default=DEFAULT_SOCKET)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, help="écoute en TCP sur host:port au lieu de la socket Unix")
+    parser.add_argument('--root', default='.', help="répertoire de travail autorisé")
+    parser.add_argument('--bdd', default='BDD_Sections.xlsx')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            ElmamyService(args.bdd, root=args.root),
+            socket_path=args.socket_path, host=args.host, port=args.port
+        ))
+    except KeyboardInterrupt:
+        pass
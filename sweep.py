@@ -0,0 +1,417 @@
+"""
+Balayage paramétrique des coefficients de flambement (ky, kz) et de moment (Cmy, Cmz)
+
+Toutes les variantes sont évaluées par un calcul NumPy vectorisé : les grandeurs
+indépendantes des coefficients (caractéristiques de section, contraintes, résistances)
+sont calculées une seule fois puis diffusées sur la grille des variantes. Le calcul est
+mené par blocs de membres et de combinaisons pour borner la mémoire.
+"""
+import numpy as np
+import pandas as pd
+
+from checkpoint import DEFAULT_DIRECTORY, run_chunks
+
+
+COEFFICIENTS = ('ky', 'kz', 'Cmy', 'Cmz')
+DEFAULTS = {'ky': 2.0, 'kz': 2.0, 'Cmy': 0.85, 'Cmz': 0.85}
+
+# À incrémenter si les critères de vérification changent (invalide les points de reprise)
+RATIO_VERSION = 2
+
+# Nombre maximal d'éléments des tableaux intermédiaires (membres x combinaisons x variantes)
+BLOCK_ELEMENTS = 2_000_000
+
+
+def _find(items, key, attr):
+    """
+    Retrouve un objet par sa clé dans le dictionnaire, sinon par son nom
+
+    Raises:
+        KeyError: si l'objet est introuvable ou si le nom désigne plusieurs objets
+    """
+    if key in items:
+        return items[key]
+    matches = [k for k, obj in items.items() if getattr(obj, attr, None) == key]
+    if len(matches) > 1:
+        raise KeyError(f"'{key}' ambigu : correspond aux ID {matches}, préciser l'ID")
+    if not matches:
+        raise KeyError(f"'{key}' introuvable")
+    return items[matches[0]]
+
+
+def _fibres(name, h, l, D=None):
+    """
+    Distances des fibres extrêmes (cy, cz) ; D/2 pour une section circulaire
+
+    Raises:
+        ValueError: si une distance est nulle (les moments seraient ignorés)
+    """
+    if D is not None and not np.isnan(float(D)) and float(D) > 0:
+        cy = cz = float(D) / 2
+    else:
+        cy, cz = float(h) / 2, float(l) / 2
+    if not (cy > 0 and cz > 0):
+        raise ValueError(f"Section '{name}' : distance de fibre extrême nulle (h={h}, l={l}, D={D})")
+    return cy, cz
+
+
+def prepare_members(member, sections, materials, temperatures=None):
+    """
+    Rassemble sous forme de tableaux les données des membres nécessaires à la vérification
+
+    Args:
+        member: dictionnaire d'objets Element
+        sections: dictionnaire d'objets Section (clé = ID, recherche aussi par nom)
+        materials: dictionnaire d'objets Material (clé = ID, recherche aussi par nom),
+            ou dictionnaire {clé de table: MaterialTable} si temperatures est fourni
+        temperatures: dictionnaire optionnel {ID membre: température [°C]}.
+            E et Sy sont alors interpolés dans les tables matériaux.
+
+    Returns:
+        dict: tableaux alignés sur les ID des membres (Element.id)
+    """
+    rows = []
+    for elem in member.values():
+        sec = _find(sections, elem.section, 'name')
+        if temperatures is None:
+            mat = _find(materials, elem.material, 'name')
+            E, Sy = mat.E, mat.Sy
+        else:
+            E, Sy = np.nan, np.nan
+        cy, cz = _fibres(sec.name, sec.h, sec.l, getattr(sec, 'D', None))
+        rows.append((sec.A, sec.Iy, sec.Iz, sec.ry, sec.rz, cy, cz,
+                     elem.lambda_rccm, E, Sy))
+    prepared = _to_arrays([elem.id for elem in member.values()], rows)
+
+    if temperatures is not None:
+        from material_table import resolve_properties
+        E, Sy, _ = resolve_properties(
+            materials,
+            [elem.material for elem in member.values()],
+            [temperatures[elem.id] for elem in member.values()]
+        )
+        prepared['E'], prepared['Sy'] = E, Sy
+    return prepared
+
+
+def prepare_from_input(data):
+    """
+    Même chose que prepare_members à partir du dictionnaire renvoyé par read_input
+
+    Les coefficients ky, kz, Cmy et Cmz lus dans le fichier sont conservés
+    dans la clé 'coefficients'.
+
+    Raises:
+        KeyError: si une section ou un matériau est introuvable ou ambigu
+        ValueError: pour une section sans h ou l (ex. tube) : le diamètre n'est pas
+            écrit dans Input.xlsx, la contrainte de flexion ne peut pas être calculée
+    """
+    df_sec = data['Sections'].copy()
+    df_sec.columns = [str(c).strip() for c in df_sec.columns]
+    df_mat = data['Matériaux'].copy()
+    df_mat.columns = [str(c).strip() for c in df_mat.columns]
+    df_mem = data['Membres'].copy()
+    df_mem.columns = [str(c).strip() for c in df_mem.columns]
+
+    def lookup(df, key):
+        match = df[df['ID'] == key]
+        if match.empty:
+            match = df[df['Nom'] == key]
+            if len(match) > 1:
+                raise KeyError(f"'{key}' ambigu : correspond aux ID {list(match['ID'])}, préciser l'ID")
+        if match.empty:
+            raise KeyError(f"'{key}' introuvable")
+        return match.iloc[0]
+
+    rows = []
+    for _, row in df_mem.iterrows():
+        sec = lookup(df_sec, row['Section'])
+        mat = lookup(df_mat, row['Matériau'])
+        cy, cz = _fibres(sec['Nom'], sec['h [mm]'], sec['l [mm]'])
+        rows.append((sec['A [mm²]'], sec['Iy [mm4]'], sec['Iz [mm4]'], sec['ry [mm]'],
+                     sec['rz [mm]'], cy, cz,
+                     row['Longueur λ [mm]'], mat['E [MPa]'], mat['Sy [MPa]']))
+
+    prepared = _to_arrays(list(df_mem['ID']), rows)
+    prepared['coefficients'] = {
+        c: df_mem[c].astype(float).to_numpy() if c in df_mem.columns
+        else np.full(len(df_mem), DEFAULTS[c])
+        for c in COEFFICIENTS
+    }
+    return prepared
+
+
+def _to_arrays(ids, rows):
+    names = ('A', 'Iy', 'Iz', 'ry', 'rz', 'cy', 'cz', 'L', 'E', 'Sy')
+    values = np.array(rows, dtype=float).reshape(len(rows), len(names))
+    prepared = {name: values[:, i] for i, name in enumerate(names)}
+    prepared['ids'] = ids
+    return prepared
+
+
+def _forces_array(ids, forces):
+    """
+    Convertit les efforts {id: [[N, My, Mz], ...]} en tableau (membres, combinaisons, 3)
+
+    N est positif en compression [N], My et Mz en [N.mm].
+    Les membres ayant moins de combinaisons sont complétés par des efforts nuls.
+
+    Raises:
+        KeyError: si des membres n'ont pas d'efforts
+    """
+    if isinstance(forces, np.ndarray):
+        return forces.reshape(len(ids), -1, 3).astype(float)
+    missing = [i for i in ids if i not in forces]
+    if missing:
+        raise KeyError(f"Efforts absents pour les membres {missing}")
+    arrays = [np.asarray(forces[i], dtype=float).reshape(-1, 3) for i in ids]
+    n_comb = max((len(a) for a in arrays), default=0) or 1
+    out = np.zeros((len(ids), n_comb, 3))
+    for i, a in enumerate(arrays):
+        out[i, :len(a)] = a
+    return out
+
+
+def _grid(ids, spec, name, groups):
+    """
+    Construit la grille (membres, n_valeurs) d'un coefficient
+
+    spec peut être une séquence appliquée à tous les membres, ou un dictionnaire
+    {id membre ou nom de groupe: séquence}. Les grilles de longueurs différentes
+    sont complétées par NaN (variantes jamais retenues).
+    """
+    if spec is None:
+        spec = [DEFAULTS[name]]
+    if not isinstance(spec, dict):
+        values = np.atleast_1d(np.asarray(spec, dtype=float))
+        return np.broadcast_to(values, (len(ids), len(values)))
+
+    per_member = {}
+    for key, values in spec.items():
+        targets = groups.get(key, [key]) if groups else [key]
+        for target in targets:
+            per_member[target] = np.atleast_1d(np.asarray(values, dtype=float))
+
+    rows = [per_member.get(i, np.array([DEFAULTS[name]])) for i in ids]
+    width = max(len(r) for r in rows)
+    out = np.full((len(ids), width), np.nan)
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out
+
+
+def _ratios(prepared, forces, ky, kz, Cmy, Cmz):
+    """
+    Taux de travail maximal sur les combinaisons, forme (membres, nky, nkz, nCmy, nCmz)
+
+    Critères d'interaction du RCC-M (ZVI) / AISC ASD :
+        fa/Fa > 0.15 : fa/Fa + Cmy.fby/((1 - fa/F'ey).Fby) + Cmz.fbz/((1 - fa/F'ez).Fbz)
+                       et fa/(0.6 Sy) + fby/Fby + fbz/Fbz
+        sinon        : fa/Fa + fby/Fby + fbz/Fbz
+    """
+    p = prepared
+
+    # ---------- Termes indépendants des coefficients (membres, combinaisons) ----------
+    Sy = p['Sy'][:, None]
+    fa = forces[:, :, 0] / p['A'][:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fby = np.abs(forces[:, :, 1]) * p['cy'][:, None] / p['Iy'][:, None]
+        fbz = np.abs(forces[:, :, 2]) * p['cz'][:, None] / p['Iz'][:, None]
+    Fb = 0.66 * Sy
+    bending = fby / Fb + fbz / Fb
+    yield_check = np.abs(fa) / (0.6 * Sy) + bending
+    compression = fa > 0
+    Cc = np.sqrt(2 * np.pi ** 2 * p['E'] / p['Sy'])
+
+    # ---------- Termes d'Euler par valeur de k (membres, nk) ----------
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sly = ky * p['L'][:, None] / p['ry'][:, None]
+        slz = kz * p['L'][:, None] / p['rz'][:, None]
+        Fey = 12 * np.pi ** 2 * p['E'][:, None] / (23 * sly ** 2)
+        Fez = 12 * np.pi ** 2 * p['E'][:, None] / (23 * slz ** 2)
+
+    # Contrainte admissible de flambement pour chaque couple (ky, kz)
+    sl = np.maximum(sly[:, :, None], slz[:, None, :])
+    cc = Cc[:, None, None]
+    E3 = p['E'][:, None, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Fa = np.where(
+            sl <= cc,
+            (1 - sl ** 2 / (2 * cc ** 2)) * p['Sy'][:, None, None]
+            / (5 / 3 + 3 * sl / (8 * cc) - sl ** 3 / (8 * cc ** 3)),
+            12 * np.pi ** 2 * E3 / (23 * sl ** 2)
+        )
+
+        # ---------- Diffusion (membres, comb, nky, nkz, nCmy, nCmz) ----------
+        fa6 = fa[:, :, None, None, None, None]
+        axial = fa6 / Fa[:, None, :, :, None, None]
+        amp_y = 1 - fa[:, :, None] / Fey[:, None, :]
+        amp_z = 1 - fa[:, :, None] / Fez[:, None, :]
+        term_y = np.where(amp_y > 0, (fby / Fb)[:, :, None] / amp_y, np.inf)
+        term_z = np.where(amp_z > 0, (fbz / Fb)[:, :, None] / amp_z, np.inf)
+        term_y = Cmy[:, None, None, None, :, None] * term_y[:, :, :, None, None, None]
+        term_z = Cmz[:, None, None, None, None, :] * term_z[:, :, None, :, None, None]
+
+    amplified = np.maximum(axial + term_y + term_z, yield_check[:, :, None, None, None, None])
+    simple = axial + bending[:, :, None, None, None, None]
+    ratio = np.where(axial > 0.15, amplified, simple)
+
+    # En traction seul le critère de résistance s'applique
+    ratio = np.where(compression[:, :, None, None, None, None], ratio,
+                     yield_check[:, :, None, None, None, None])
+
+    # Les variantes incomplètes (NaN) restent NaN
+    mask = (np.isnan(ky)[:, :, None, None, None] | np.isnan(kz)[:, None, :, None, None]
+            | np.isnan(Cmy)[:, None, None, :, None] | np.isnan(Cmz)[:, None, None, None, :])
+    ratio = ratio.max(axis=1)
+    ratio[mask] = np.nan
+    return ratio
+
+
+def _evaluate(prepared, forces, grids):
+    """
+    Applique _ratios par blocs de membres et de combinaisons pour borner la mémoire
+
+    Le maximum sur les combinaisons est pris au fil des blocs ; un taux NaN est conservé
+    quelle que soit la taille des blocs.
+    """
+    n_members, n_comb = forces.shape[:2]
+    shape = tuple(grids[name].shape[1] for name in COEFFICIENTS)
+    n_var = int(np.prod(shape))
+    comb_block = max(1, min(n_comb, BLOCK_ELEMENTS // n_var))
+    member_block = max(1, BLOCK_ELEMENTS // (n_var * comb_block))
+
+    ratio = np.empty((n_members,) + shape)
+    for start in range(0, n_members, member_block):
+        rows = slice(start, start + member_block)
+        sub = {k: v[rows] for k, v in prepared.items() if isinstance(v, np.ndarray)}
+        grid = {name: g[rows] for name, g in grids.items()}
+        block = None
+        for c in range(0, n_comb, comb_block):
+            r = _ratios(sub, forces[rows, c:c + comb_block], **grid)
+            block = r if block is None else np.maximum(block, r)
+        ratio[rows] = block
+    return ratio
+
+
+def sweep_coefficients(prepared, forces, ky=None, kz=None, Cmy=None, Cmz=None, groups=None,
+                       checkpoint_dir=DEFAULT_DIRECTORY, chunk_size=500):
+    """
+    Évalue toutes les combinaisons de ky, kz, Cmy et Cmz et retient pour chaque membre
+    le jeu admissible le moins conservatif, c'est-à-dire celui dont le taux de travail
+    est le plus proche de 1 sans le dépasser
+
+    Args:
+        prepared: résultat de prepare_members ou prepare_from_input
+        forces: efforts {id membre: [[N, My, Mz], ...]} ou tableau (membres, combinaisons, 3)
+        ky, kz, Cmy, Cmz: séquence de valeurs commune à tous les membres, ou dictionnaire
+            {id membre ou nom de groupe: séquence}. None = valeur par défaut.
+        groups: dictionnaire optionnel {nom de groupe: [id membres]}
+        checkpoint_dir: répertoire des points de reprise : le calcul est fait par paquets
+            de membres et les paquets déjà calculés sont repris. None = sans reprise.
+        chunk_size: étendue d'ID de membres couverte par un paquet
+
+    Returns:
+        tuple: (DataFrame des jeux retenus indexé par membre, tableau des taux
+                de forme (membres, nky, nkz, nCmy, nCmz))
+    """
+    ids = prepared['ids']
+    grids = {
+        name: _grid(ids, spec, name, groups)
+        for name, spec in zip(COEFFICIENTS, (ky, kz, Cmy, Cmz))
+    }
+    forces = _forces_array(ids, forces)
+
+    if checkpoint_dir is None:
+        ratio = _evaluate(prepared, forces, grids)
+    else:
+        def subset(positions):
+            sub = {k: v[positions] for k, v in prepared.items() if isinstance(v, np.ndarray)}
+            grid = {name: g[positions] for name, g in grids.items()}
+            return sub, forces[positions], grid
+
+        def compute(positions):
+            sub, f, grid = subset(positions)
+            return _evaluate(sub, f, grid)
+
+        # Le contexte couvre la version et le code des critères ainsi que les valeurs
+        # balayées, pour que plusieurs balayages partagent le répertoire sans se gêner
+        values = {name: np.unique(g[~np.isnan(g)]) for name, g in grids.items()}
+        context = (RATIO_VERSION, _ratios, _evaluate, values)
+        ratio = np.empty((len(ids),) + tuple(grids[name].shape[1] for name in COEFFICIENTS))
+        for positions, block in run_chunks(ids, compute, subset, checkpoint_dir,
+                                           chunk_size=chunk_size, context=context):
+            ratio[positions] = block
+
+    # Sélection du jeu retenu
+    flat = ratio.reshape(len(ids), int(np.prod(ratio.shape[1:])))
+    passing = np.nan_to_num(flat, nan=np.inf) <= 1.0
+    has_passing = passing.any(axis=1)
+    # À taux égal (ex. membre tendu), on garde la dernière variante de la grille
+    n_var = flat.shape[1]
+    best_pass = n_var - 1 - np.where(passing, flat, -np.inf)[:, ::-1].argmax(axis=1)
+    best_fail = np.nan_to_num(flat, nan=np.inf).argmin(axis=1)
+    best = np.where(has_passing, best_pass, best_fail)
+    idx = np.unravel_index(best, ratio.shape[1:])
+
+    rows = np.arange(len(ids))
+    result = pd.DataFrame({
+        name: grids[name][rows, idx[i]] for i, name in enumerate(COEFFICIENTS)
+    }, index=pd.Index(ids, name='ID'))
+    result['Taux'] = flat[rows, best]
+    result['Admissible'] = has_passing
+    return result, ratio
+
+
+def check_members(prepared, forces, checkpoint_dir=DEFAULT_DIRECTORY):
+    """
+    Vérifie les membres avec les coefficients lus dans le fichier d'entrée
+
+    Args:
+        checkpoint_dir: répertoire des points de reprise (None = sans reprise)
+
+    Returns:
+        DataFrame: taux de travail et admissibilité par membre
+    """
+    coefs = prepared.get('coefficients', {})
+    specs = {
+        name: dict(zip(prepared['ids'], ([v] for v in coefs[name]))) if name in coefs else None
+        for name in COEFFICIENTS
+    }
+    result, _ = sweep_coefficients(prepared, forces, checkpoint_dir=checkpoint_dir, **specs)
+    return result
+
+
+# ========== TEST ==========
+
+if __name__ == "__main__":
+
+    from material import Material
+    from element import Element
+    from section import Section
+
+    data_material = {
+        1: Material(name='S355', temperature=50, E=200000.0, Sy=312.0, Su=470.0, poisson=0.3)
+    }
+    data_section = {
+        1: Section(name='HEB 120', is_closed=False, h=120.0, l=120.0, D=None, tw=6.5,
+                   tf=11.0, A=3400.0, Iy=8640000.0, Iz=3180000.0, ry=50.4, rz=30.6,
+                   Am=1700.0, b_t=5.5, d_t=15.1, Sp=[])
+    }
+    data_beam = {
+        i: Element(id=i, nodes_id=[i, i + 1], section='HEB 120', material='S355',
+                   lambda_rccm=2000 + 100 * i, Lb=1000)
+        for i in range(1, 6)
+    }
+    efforts = {i: [[150000.0, 4.0e6, 1.0e6], [80000.0, 8.0e6, 0.5e6]] for i in data_beam}
+
+    prepared = prepare_members(data_beam, data_section, data_material)
+    result, ratio = sweep_coefficients(
+        prepared, efforts,
+        ky=np.linspace(0.5, 2.0, 4),
+        kz=np.linspace(0.5, 2.0, 4),
+        Cmy=[0.4, 0.6, 0.85],
+        Cmz=[0.4, 0.6, 0.85]
+    )
+    print(f"{ratio[0].size} variantes évaluées par membre")
+    print(result)